@@ -4,6 +4,11 @@ import logging
 import json
 from datetime import datetime
 import os
+import mmap
+import sys
+import queue
+import struct
+import subprocess
 
 try:
     import streamlit as st
@@ -17,8 +22,68 @@ try:
 except ImportError:
     STREAMLIT_AVAILABLE = False
 
+try:
+    from multiprocessing import shared_memory
+    SHARED_MEMORY_AVAILABLE = True
+except ImportError:
+    SHARED_MEMORY_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger("OAM-Platform")
 
+CACHE_SECTIONS = ("platform_status", "alarms", "kpi_summary", "events", "ip_stats")
+# Cache section -> (platform component, getter) for the per-component sections.
+SECTION_SOURCES = {
+    "alarms": ("oam", "get_alarms"),
+    "kpi_summary": ("kpi", "get_kpi_summary"),
+    "events": ("event", "get_events"),
+    "ip_stats": ("ip", "get_status"),
+}
+
+# Snapshot header shared by the shared-memory segment and the cache file: payload length, run id, sequence number.
+# The run id is the writer's start time in ns, so (run id, seq) stamps order snapshots across platform restarts.
+# The sequence is odd while a shared-memory write is in progress.
+SNAPSHOT_HEADER = struct.Struct("<QQQ")
+_SNAPSHOT_READ_RETRIES = 100  # ~100 ms of 1 ms waits before giving up on a segment whose writer died mid-write
+_SERVER_STOP_TIMEOUT = 5  # seconds to let streamlit exit after SIGTERM before killing it
+
+def read_shared_snapshot(shm, last_stamp=None):
+    # Returns ((run_id, seq), payload) for the latest published snapshot, or None if nothing new since last_stamp
+    # or no consistent snapshot could be read.
+    for _ in range(_SNAPSHOT_READ_RETRIES):
+        length, run_id, seq = SNAPSHOT_HEADER.unpack_from(shm.buf, 0)
+        if seq == 0 or (run_id, seq) == last_stamp:
+            return None
+        if seq % 2:
+            time.sleep(0.001)
+            continue
+        payload = bytes(shm.buf[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + length])
+        if SNAPSHOT_HEADER.unpack_from(shm.buf, 0)[1:] == (run_id, seq):
+            return (run_id, seq), payload
+    return None
+
+def read_cache_file(path, last_stamp=None):
+    # Returns ((run_id, seq), payload) from the framed cache file, or None if it is missing or unchanged since last_stamp.
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            length, run_id, seq = SNAPSHOT_HEADER.unpack_from(mm, 0)
+            if (run_id, seq) == last_stamp:
+                return None
+            return (run_id, seq), mm[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + length]
+    except (OSError, ValueError, struct.error):
+        return None
+
+def _dumps(obj):
+    if ORJSON_AVAILABLE:
+        # Alarms are keyed by integer id, which orjson only accepts with OPT_NON_STR_KEYS.
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode()
+
 class Dashboard:
     """Web Dashboard for the 5G OA&M Platform"""
     def __init__(self, platform):
@@ -34,6 +99,18 @@ class Dashboard:
             "events": [],
             "ip_stats": {}
         }
+        self.cache_path = "dashboard_cache.bin"
+        self._proc = None
+        self.shm_name = "oam_cache"
+        self.shm_size = 8 << 20  # bytes
+        self._shm = None
+        self._shm_lock = threading.Lock()
+        self._run_id = 0
+        self._snapshot_seq = 0
+        self._flush_queue = queue.Queue(maxsize=1)
+        self._cache_fragments = {}
+        self._dirty_sections = set(CACHE_SECTIONS)
+        self._section_versions = {}
     def start(self):
         if self.running:
             return
@@ -42,16 +119,43 @@ class Dashboard:
         if not STREAMLIT_AVAILABLE:
             logger.warning("Streamlit not available. Running in limited mode.")
             return
-        threading.Thread(target=self._run_dashboard, name="dashboard-thread", daemon=True).start()
+        self._run_id = time.time_ns()
+        self._snapshot_seq = 0
+        # A cache file from an earlier run is never newer than this run's data; drop it rather than let it be served.
+        try:
+            os.remove(self.cache_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove stale cache file {self.cache_path}: {str(e)}")
+        self._open_shared_memory()
+        self._run_dashboard()
         threading.Thread(target=self._update_data_loop, name="dashboard-data-thread", daemon=True).start()
+        threading.Thread(target=self._flush_loop, name="dashboard-flush-thread", daemon=True).start()
     def stop(self):
         self.running = False
+        if self._proc is not None:
+            if self._proc.poll() is None:
+                self._proc.terminate()
+                # Reap the server so it neither lingers as a zombie nor keeps holding the port.
+                try:
+                    self._proc.wait(timeout=_SERVER_STOP_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    self._proc.kill()
+                    self._proc.wait()
+            self._proc = None
+        with self._shm_lock:
+            if self._shm is not None:
+                self._shm.close()
+                self._shm.unlink()
+                self._shm = None
         logger.info("Stopped Web Dashboard")
     def get_status(self):
         return {
             "status": "running" if self.running else "stopped",
             "streamlit_available": STREAMLIT_AVAILABLE,
             "port": self.port,
+            "snapshot_transport": "shared_memory" if self._shm is not None else "file",
             "last_update": self.cache["last_update"].isoformat() if self.cache["last_update"] else None
         }
     def _update_data_loop(self):
@@ -59,7 +163,7 @@ class Dashboard:
         while self.running:
             try:
                 self._update_dashboard_data()
-                self._save_cache_to_files()
+                self._publish_snapshot(self._serialize_cache())
                 time.sleep(self.refresh_interval)
             except Exception as e:
                 logger.error(f"Error updating dashboard data: {str(e)}")
@@ -67,48 +171,89 @@ class Dashboard:
     def _update_dashboard_data(self):
         logger.info("Updating dashboard data")
         self.cache["last_update"] = datetime.now()
-        self.cache["platform_status"] = self.platform.get_status()
-        if "oam" in self.platform.components:
-            self.cache["alarms"] = self.platform.components["oam"].get_alarms()
-        if "kpi" in self.platform.components:
-            self.cache["kpi_summary"] = self.platform.components["kpi"].get_kpi_summary()
-        if "event" in self.platform.components:
-            self.cache["events"] = self.platform.components["event"].get_events()
-        if "ip" in self.platform.components:
-            self.cache["ip_stats"] = self.platform.components["ip"].get_status()
-    def _save_cache_to_files(self):
+        self._set_section("platform_status", self.platform.get_status())
+        for section, (name, getter) in SECTION_SOURCES.items():
+            component = self.platform.components.get(name)
+            if component is None:
+                continue
+            # Components expose a version counter; skip sections whose source has not changed since the last refresh.
+            version = getattr(component, "version", None)
+            if version is not None and self._section_versions.get(section) == version:
+                continue
+            self._set_section(section, getattr(component, getter)())
+            self._section_versions[section] = version
+    def _set_section(self, section, value):
+        self.cache[section] = value
+        self._dirty_sections.add(section)
+    def _serialize_cache(self):
+        # Only re-serialize sections refreshed since the last snapshot; the rest reuse their cached JSON.
+        for section in self._dirty_sections:
+            self._cache_fragments[section] = _dumps(self.cache[section])
+        self._dirty_sections.clear()
+        return b"{" + b",".join(_dumps(section) + b":" + self._cache_fragments[section] for section in CACHE_SECTIONS) + b"}"
+    def _open_shared_memory(self):
+        if not SHARED_MEMORY_AVAILABLE:
+            return
+        try:
+            try:
+                self._shm = shared_memory.SharedMemory(name=self.shm_name, create=True, size=self.shm_size)
+            except FileExistsError:
+                # Left behind by a previous run that did not shut down cleanly.
+                stale = shared_memory.SharedMemory(name=self.shm_name)
+                stale.close()
+                stale.unlink()
+                self._shm = shared_memory.SharedMemory(name=self.shm_name, create=True, size=self.shm_size)
+            logger.info(f"Publishing dashboard snapshots to shared memory segment {self.shm_name}")
+        except OSError as e:
+            logger.warning(f"Shared memory not available, using cache file instead: {str(e)}")
+            self._shm = None
+    def _publish_snapshot(self, payload):
+        self._snapshot_seq += 2
+        with self._shm_lock:
+            if self._shm is not None and SNAPSHOT_HEADER.size + len(payload) <= self._shm.size:
+                buf = self._shm.buf
+                SNAPSHOT_HEADER.pack_into(buf, 0, len(payload), self._run_id, self._snapshot_seq - 1)
+                buf[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + len(payload)] = payload
+                SNAPSHOT_HEADER.pack_into(buf, 0, len(payload), self._run_id, self._snapshot_seq)
+                return
+        # No shared memory segment, or the snapshot outgrew it: fall back to the cache file,
+        # framed with the same header so readers can skip decoding unchanged snapshots.
+        self._enqueue_flush(SNAPSHOT_HEADER.pack(len(payload), self._run_id, self._snapshot_seq) + payload)
+    def _enqueue_flush(self, payload):
         try:
-            with open("dashboard_cache_platform_status.json", "w") as f:
-                json.dump(self.cache["platform_status"], f)
-            with open("dashboard_cache_alarms.json", "w") as f:
-                json.dump(self.cache["alarms"], f)
-            with open("dashboard_cache_kpi_summary.json", "w") as f:
-                json.dump(self.cache["kpi_summary"], f)
-            with open("dashboard_cache_events.json", "w") as f:
-                json.dump(self.cache["events"], f)
-            with open("dashboard_cache_ip_stats.json", "w") as f:
-                json.dump(self.cache["ip_stats"], f)
-            logger.info("Saved cache data to files")
+            self._flush_queue.put_nowait(payload)
+        except queue.Full:
+            # The writer is behind; replace the pending snapshot since only the newest one matters.
+            try:
+                self._flush_queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._flush_queue.put_nowait(payload)
+    def _flush_loop(self):
+        logger.info("Starting dashboard cache flush loop")
+        while self.running:
+            try:
+                payload = self._flush_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            self._save_cache_to_file(payload)
+    def _save_cache_to_file(self, payload):
+        try:
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.cache_path)
+            logger.info(f"Saved cache data to {self.cache_path}")
         except Exception as e:
-            logger.error(f"Error saving cache to files: {str(e)}")
+            logger.error(f"Error saving cache to file: {str(e)}")
     def _run_dashboard(self):
         if not STREAMLIT_AVAILABLE:
             logger.warning("Cannot run dashboard: Streamlit not available")
             return
-        script_path = "dashboard_app.py"
-        with open(script_path, "w") as f:
-            f.write("""
-import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import json
-import time
-from datetime import datetime, timedelta
-import os
-# ... (dashboard Streamlit code omitted for brevity; see original for full code) ...
-""")
-        os.system(f"streamlit run {script_path} --server.port={self.port}")
+        # dashboard_app.py ships next to this module; runtime settings reach it through the environment.
+        script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard_app.py")
+        env = dict(os.environ, OAM_CACHE_PATH=os.path.abspath(self.cache_path), OAM_SHM_NAME=self.shm_name, OAM_REFRESH_MS=str(int(self.refresh_interval * 1000)))
+        try:
+            self._proc = subprocess.Popen([sys.executable, "-m", "streamlit", "run", script_path, f"--server.port={self.port}"], env=env)
+        except OSError as e:
+            logger.error(f"Error launching Streamlit: {str(e)}")
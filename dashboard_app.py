@@ -0,0 +1,86 @@
+import json
+import os
+import time
+from multiprocessing import shared_memory, resource_tracker
+
+import pandas as pd
+import streamlit as st
+
+from dashboard import read_cache_file, read_shared_snapshot
+
+CACHE_PATH = os.environ.get("OAM_CACHE_PATH", "dashboard_cache.bin")
+SHM_NAME = os.environ.get("OAM_SHM_NAME", "oam_cache")
+REFRESH_MS = int(os.environ.get("OAM_REFRESH_MS", "10000"))
+
+@st.cache_resource
+def attach_shared_memory():
+    try:
+        shm = shared_memory.SharedMemory(name=SHM_NAME)
+    except OSError:
+        return None
+    # The platform owns the segment; keep this process's resource tracker from unlinking it on exit.
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+def load_snapshot():
+    # Decode a snapshot only when its (run id, seq) stamp moved past the one already held in the session.
+    state = st.session_state
+    last_stamp = state.get("snapshot_stamp", (0, 0))
+    candidates = []
+    shm = attach_shared_memory()
+    if shm is not None:
+        candidates.append(read_shared_snapshot(shm, last_stamp))
+    candidates.append(read_cache_file(CACHE_PATH, last_stamp))
+    candidates = [c for c in candidates if c is not None and c[0] > last_stamp]
+    if candidates:
+        stamp, payload = max(candidates, key=lambda c: c[0])
+        state["snapshot_stamp"] = stamp
+        state["snapshot"] = json.loads(payload)
+    return state.get("snapshot")
+
+st.set_page_config(page_title="5G OA&M Platform", layout="wide")
+st.title("5G OA&M Automation Platform")
+snapshot = load_snapshot()
+if snapshot is None:
+    st.info("Waiting for platform data...")
+else:
+    status = snapshot["platform_status"] or {}
+    st.caption(f"Platform {status.get('platform', 'unknown')} - last update {status.get('timestamp', 'n/a')}")
+    tab_alarms, tab_kpis, tab_events, tab_ip, tab_components = st.tabs(["Alarms", "KPIs", "Events", "IP Traffic", "Components"])
+    with tab_alarms:
+        alarms = snapshot["alarms"]
+        alarms = list(alarms.values()) if isinstance(alarms, dict) else alarms
+        if alarms:
+            df = pd.DataFrame(alarms)
+            st.bar_chart(df["severity"].value_counts())
+            st.dataframe(df, use_container_width=True)
+        else:
+            st.write("No alarms raised")
+    with tab_kpis:
+        rows = [{"kpi": kpi_id, "node": node_id, **stats} for kpi_id, nodes in snapshot["kpi_summary"].items() for node_id, stats in nodes.items()]
+        if rows:
+            st.dataframe(pd.DataFrame(rows), use_container_width=True)
+        else:
+            st.write("No KPI data collected yet")
+    with tab_events:
+        events = snapshot["events"]
+        if events:
+            # Flatten details and multi-node targets so every column has a single type.
+            df = pd.DataFrame([{
+                "id": e["id"],
+                "type": e["type"],
+                "target": e.get("target_node") or ", ".join(e.get("target_nodes", [])),
+                "timestamp": e["timestamp"],
+                "details": json.dumps(e["details"]),
+            } for e in reversed(events)])
+            st.bar_chart(df["type"].value_counts())
+            st.dataframe(df, use_container_width=True)
+        else:
+            st.write("No events generated yet")
+    with tab_ip:
+        st.json(snapshot["ip_stats"])
+    with tab_components:
+        st.json(status.get("components", {}))
+
+time.sleep(REFRESH_MS / 1000)
+st.rerun()
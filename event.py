@@ -4,10 +4,29 @@ import random
 import logging
 from datetime import datetime, timedelta
 from enum import Enum
+from dataclasses import dataclass
+from collections import defaultdict, deque
+from bisect import bisect_left
+from itertools import count, islice
+from operator import attrgetter
 import json
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger("OAM-Platform")
 
+def _iso_from_ns(ts_ns):
+    return datetime.fromtimestamp(ts_ns / 1e9).isoformat()
+
+def _to_json(obj):
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
 class EventType(Enum):
     NODE_FAILURE = 1
     SERVICE_FAILURE = 2
@@ -18,12 +37,110 @@ class EventType(Enum):
     FAILOVER = 7
     RECOVERY = 8
 
+@dataclass(slots=True)
+class Event:
+    """Simulated network event record"""
+    id: int
+    type: str
+    target_type: str
+    ts_ns: int
+    details: dict
+    target_node: str | None = None
+    target_nodes: list | None = None  # set instead of target_node for multi-node events such as load tests
+    @property
+    def timestamp(self):
+        return _iso_from_ns(self.ts_ns)
+    def node_ids(self):
+        return self.target_nodes if self.target_nodes is not None else (self.target_node,)
+    def to_dict(self):
+        # Same layout the simulator has always exposed, with the ISO timestamp rendered on demand.
+        if self.target_nodes is None:
+            event = {"id": self.id, "type": self.type, "target_node": self.target_node, "target_type": self.target_type}
+        else:
+            event = {"id": self.id, "type": self.type, "target_type": self.target_type, "target_nodes": self.target_nodes}
+        event["timestamp"] = self.timestamp
+        event["details"] = self.details
+        return event
+
+_FAILURE_REASONS = ("Hardware failure", "Software crash", "Power outage", "Network connectivity loss")
+_SEVERITIES = ("Critical", "Major", "Minor")
+_SERVICE_NAMES = ("Authentication", "Session Management", "Policy Control", "User Plane")
+_SERVICE_FAILURE_REASONS = ("Timeout", "Internal error", "Dependency failure", "Resource constraint")
+_INTERFACES = ("N1", "N2", "N3", "N4", "N6", "All")
+_BREACH_TYPES = ("Unauthorized access", "Authentication bypass", "DDoS attack", "Data exfiltration")
+_RESOURCE_TYPES = ("CPU", "Memory", "Disk", "Network bandwidth", "Connection pool")
+_CHANGE_TYPES = ("Parameter update", "Software upgrade", "Policy change", "Security hardening")
+_CHANGE_REASONS = ("Planned maintenance", "Performance optimization", "Security patch", "Bug fix")
+_FAILOVER_TYPES = ("Automatic", "Manual", "Scheduled")
+_RECOVERY_ACTIONS = ("Restart", "Failback", "Reconfiguration", "Manual intervention")
+
+# Choice tuples are bound as default arguments so the builders read them as locals.
+def _node_failure_details(node, rng, _reasons=_FAILURE_REASONS, _severities=_SEVERITIES):
+    return {"failure_reason": rng.choice(_reasons), "severity": rng.choice(_severities)}
+
+def _service_failure_details(node, rng, _services=_SERVICE_NAMES, _reasons=_SERVICE_FAILURE_REASONS):
+    return {"service_name": rng.choice(_services), "failure_reason": rng.choice(_reasons), "affected_users": rng.randint(10, 1000)}
+
+def _network_congestion_details(node, rng, _interfaces=_INTERFACES):
+    return {"congestion_level": rng.uniform(70, 100), "affected_interfaces": rng.choice(_interfaces), "duration_seconds": rng.randint(30, 300)}
+
+def _security_breach_details(node, rng, _breaches=_BREACH_TYPES, _severities=_SEVERITIES):
+    return {"breach_type": rng.choice(_breaches), "severity": rng.choice(_severities), "affected_systems": rng.randint(1, 5)}
+
+def _resource_exhaustion_details(node, rng, _resources=_RESOURCE_TYPES):
+    return {"resource_type": rng.choice(_resources), "utilization": rng.uniform(90, 100), "available_capacity": rng.uniform(0, 10)}
+
+def _configuration_change_details(node, rng, _changes=_CHANGE_TYPES, _reasons=_CHANGE_REASONS):
+    return {"change_type": rng.choice(_changes), "change_reason": rng.choice(_reasons), "change_id": f"CHG-{rng.randint(1000, 9999)}"}
+
+def _failover_details(node, rng, _failover_types=_FAILOVER_TYPES):
+    return {"failover_target": f"{node['type']}-BACKUP", "failover_type": rng.choice(_failover_types), "failover_duration_seconds": rng.randint(5, 60)}
+
+def _recovery_details(node, rng, _actions=_RECOVERY_ACTIONS):
+    return {"recovery_action": rng.choice(_actions), "recovery_duration_seconds": rng.randint(10, 300), "success": rng.random() < 0.9}
+
+def _mark_node_down(node, details):
+    node["status"] = "down"
+
+def _mark_node_recovered(node, details):
+    if details["success"]:
+        node["status"] = "active"
+
+_EVENT_TYPES = tuple(EventType)
+
+_DETAIL_BUILDERS = {
+    EventType.NODE_FAILURE: _node_failure_details,
+    EventType.SERVICE_FAILURE: _service_failure_details,
+    EventType.NETWORK_CONGESTION: _network_congestion_details,
+    EventType.SECURITY_BREACH: _security_breach_details,
+    EventType.RESOURCE_EXHAUSTION: _resource_exhaustion_details,
+    EventType.CONFIGURATION_CHANGE: _configuration_change_details,
+    EventType.FAILOVER: _failover_details,
+    EventType.RECOVERY: _recovery_details,
+}
+
+# Event types that change the target node's status, and how.
+_STATUS_UPDATERS = {
+    EventType.NODE_FAILURE: _mark_node_down,
+    EventType.RECOVERY: _mark_node_recovered,
+}
+
 class EventSimulator:
     """Event Simulation for 5G/LTE networks"""
     def __init__(self):
         self.running = False
+        self._stop_evt = threading.Event()
         self.simulation_interval = 120  # seconds
-        self.events = []
+        self.max_events = 10000  # most recent events retained
+        self.events = deque(maxlen=self.max_events)
+        self._event_ids = count(1)
+        self.events_generated = 0
+        self.version = 0  # bumped whenever an event is recorded
+        self._rng = random.Random()
+        self._event_times = deque(maxlen=self.max_events)  # epoch ns, parallel to self.events
+        self._events_by_type = defaultdict(deque)
+        self._lock = threading.Lock()
+        self._events_by_node = defaultdict(deque)
         self.network_nodes = [
             {"id": "gnb-001", "type": "gNB", "ip": "10.0.1.1", "status": "active"},
             {"id": "gnb-002", "type": "gNB", "ip": "10.0.1.2", "status": "active"},
@@ -32,6 +149,9 @@ class EventSimulator:
             {"id": "upf-001", "type": "UPF", "ip": "10.0.3.1", "status": "active"},
             {"id": "pcf-001", "type": "PCF", "ip": "10.0.3.2", "status": "active"},
         ]
+        self._nodes_by_type = defaultdict(list)
+        for node in self.network_nodes:
+            self._nodes_by_type[node["type"]].append(node)
         self.scenarios = [
             {
                 "name": "AMF Failover",
@@ -86,222 +206,203 @@ class EventSimulator:
         if self.running:
             return
         self.running = True
+        self._stop_evt.clear()
         logger.info("Starting Event Simulation module")
         threading.Thread(target=self._simulation_loop, name="event-simulation-thread", daemon=True).start()
     def stop(self):
         self.running = False
+        self._stop_evt.set()
         logger.info("Stopped Event Simulation module")
     def get_status(self):
         return {
             "status": "running" if self.running else "stopped",
-            "events_generated": len(self.events),
+            "events_generated": self.events_generated,
             "scenarios_available": len(self.scenarios)
         }
     def _simulation_loop(self):
         logger.info("Starting event simulation loop")
         while self.running:
             logger.info("Running event simulation cycle")
-            if random.random() < 0.7:
+            if self._rng.random() < 0.7:
                 self._run_scenario()
             else:
                 self._generate_random_events()
-            time.sleep(self.simulation_interval)
+            if self._stop_evt.wait(self.simulation_interval):
+                break
     def _run_scenario(self):
-        scenario = random.choice(self.scenarios)
-        logger.info(f"Running scenario: {scenario['name']}")
-        logger.info(f"Description: {scenario['description']}")
+        scenario = self._rng.choice(self.scenarios)
+        logger.info("Running scenario: %s", scenario['name'])
+        logger.info("Description: %s", scenario['description'])
         for event_def in scenario['events']:
-            if random.random() > event_def['probability']:
-                logger.info(f"Event {event_def['type'].name} skipped due to probability")
+            if self._rng.random() > event_def['probability']:
+                logger.info("Event %s skipped due to probability", event_def['type'].name)
                 continue
             if event_def['target_type'] == 'ALL':
                 target_nodes = self.network_nodes
             else:
-                target_nodes = [node for node in self.network_nodes if node['type'] == event_def['target_type']]
+                target_nodes = self._nodes_by_type.get(event_def['target_type'], [])
             if not target_nodes:
-                logger.warning(f"No matching nodes found for type {event_def['target_type']}")
+                logger.warning("No matching nodes found for type %s", event_def['target_type'])
                 continue
-            target_node = random.choice(target_nodes)
+            target_node = self._rng.choice(target_nodes)
             self._generate_event(event_def['type'], target_node)
-            time.sleep(random.uniform(1, 5))
+            if self._stop_evt.wait(self._rng.uniform(1, 5)):
+                return
     def _generate_random_events(self):
         logger.info("Generating random events")
-        num_events = random.randint(1, 3)
+        num_events = self._rng.randint(1, 3)
         for _ in range(num_events):
-            event_type = random.choice(list(EventType))
-            target_node = random.choice(self.network_nodes)
+            event_type = self._rng.choice(_EVENT_TYPES)
+            target_node = self._rng.choice(self.network_nodes)
             self._generate_event(event_type, target_node)
-            time.sleep(random.uniform(1, 3))
-    def _generate_event(self, event_type, target_node):
-        event_id = len(self.events) + 1
-        timestamp = datetime.now().isoformat()
-        logger.info(f"Generating event: {event_type.name} for node {target_node['id']}")
-        event = {
-            "id": event_id,
-            "type": event_type.name,
-            "target_node": target_node['id'],
-            "target_type": target_node['type'],
-            "timestamp": timestamp,
-            "details": {}
-        }
-        if event_type == EventType.NODE_FAILURE:
-            event["details"] = {
-                "failure_reason": random.choice(["Hardware failure", "Software crash", "Power outage", "Network connectivity loss"]),
-                "severity": random.choice(["Critical", "Major", "Minor"])
-            }
-            target_node["status"] = "down"
-        elif event_type == EventType.SERVICE_FAILURE:
-            event["details"] = {
-                "service_name": random.choice(["Authentication", "Session Management", "Policy Control", "User Plane"]),
-                "failure_reason": random.choice(["Timeout", "Internal error", "Dependency failure", "Resource constraint"]),
-                "affected_users": random.randint(10, 1000)
-            }
-        elif event_type == EventType.NETWORK_CONGESTION:
-            event["details"] = {
-                "congestion_level": random.uniform(70, 100),
-                "affected_interfaces": random.choice(["N1", "N2", "N3", "N4", "N6", "All"]),
-                "duration_seconds": random.randint(30, 300)
-            }
-        elif event_type == EventType.SECURITY_BREACH:
-            event["details"] = {
-                "breach_type": random.choice(["Unauthorized access", "Authentication bypass", "DDoS attack", "Data exfiltration"]),
-                "severity": random.choice(["Critical", "Major", "Minor"]),
-                "affected_systems": random.randint(1, 5)
-            }
-        elif event_type == EventType.RESOURCE_EXHAUSTION:
-            event["details"] = {
-                "resource_type": random.choice(["CPU", "Memory", "Disk", "Network bandwidth", "Connection pool"]),
-                "utilization": random.uniform(90, 100),
-                "available_capacity": random.uniform(0, 10)
-            }
-        elif event_type == EventType.CONFIGURATION_CHANGE:
-            event["details"] = {
-                "change_type": random.choice(["Parameter update", "Software upgrade", "Policy change", "Security hardening"]),
-                "change_reason": random.choice(["Planned maintenance", "Performance optimization", "Security patch", "Bug fix"]),
-                "change_id": f"CHG-{random.randint(1000, 9999)}"
-            }
-        elif event_type == EventType.FAILOVER:
-            event["details"] = {
-                "failover_target": f"{target_node['type']}-BACKUP",
-                "failover_type": random.choice(["Automatic", "Manual", "Scheduled"]),
-                "failover_duration_seconds": random.randint(5, 60)
-            }
-        elif event_type == EventType.RECOVERY:
-            event["details"] = {
-                "recovery_action": random.choice(["Restart", "Failback", "Reconfiguration", "Manual intervention"]),
-                "recovery_duration_seconds": random.randint(10, 300),
-                "success": random.random() < 0.9
-            }
-            if event["details"]["success"]:
-                target_node["status"] = "active"
-        self.events.append(event)
-        logger.warning(f"EVENT: {event_type.name} on {target_node['id']} - {json.dumps(event['details'])}")
+            if self._stop_evt.wait(self._rng.uniform(1, 3)):
+                return
+    def _generate_event(self, event_type, target_node, ts_ns=None):
+        event_id = next(self._event_ids)
+        if ts_ns is None:
+            ts_ns = time.time_ns()
+        logger.info("Generating event: %s for node %s", event_type.name, target_node['id'])
+        details = _DETAIL_BUILDERS[event_type](target_node, self._rng)
+        event = Event(id=event_id, type=event_type.name, target_type=target_node['type'], ts_ns=ts_ns, details=details, target_node=target_node['id'])
+        status_updater = _STATUS_UPDATERS.get(event_type)
+        if status_updater is not None:
+            status_updater(target_node, details)
+        self._record_event(event)
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning("EVENT: %s on %s - %s", event_type.name, target_node['id'], _to_json(details))
         return event
+    def _record_event(self, event):
+        with self._lock:
+            # Writers stamp events before taking the lock, so clamp to keep the buffers in timestamp order for bisection.
+            if self._event_times and event.ts_ns < self._event_times[-1]:
+                event.ts_ns = self._event_times[-1]
+            if len(self.events) == self.max_events:
+                # The evicted event is the oldest one, so it sits at the left end of each of its index buckets.
+                evicted = self.events[0]
+                self._events_by_type[evicted.type].popleft()
+                for node_id in evicted.node_ids():
+                    self._events_by_node[node_id].popleft()
+            self.events.append(event)
+            self.events_generated += 1
+            self._event_times.append(event.ts_ns)
+            self._events_by_type[event.type].append(event)
+            for node_id in event.node_ids():
+                self._events_by_node[node_id].append(event)
+            self.version += 1
     def get_events(self, event_type=None, node_id=None, time_range=None):
-        filtered_events = self.events
-        if event_type:
-            filtered_events = [e for e in filtered_events if e["type"] == event_type.name]
-        if node_id:
-            filtered_events = [e for e in filtered_events if e["target_node"] == node_id]
-        if time_range:
-            cutoff_time = (datetime.now() - time_range).isoformat()
-            filtered_events = [e for e in filtered_events if e["timestamp"] >= cutoff_time]
-        return filtered_events
+        # Only the matching Event references are collected under the lock, so the buffers cannot rotate mid-read;
+        # records are immutable once recorded, so rendering them to dicts happens after the lock is released.
+        with self._lock:
+            events = self._query_events(event_type, node_id, time_range)
+        return [event.to_dict() for event in events]
+    def _query_events(self, event_type, node_id, time_range):
+        cutoff_ns = time.time_ns() - time_range // timedelta(microseconds=1) * 1000 if time_range else None
+        if not event_type and not node_id:
+            # Unfiltered reads bisect the integer timestamps directly without touching the event dicts.
+            start = bisect_left(self._event_times, cutoff_ns) if cutoff_ns is not None else 0
+            return list(islice(self.events, start, None))
+        if event_type and node_id:
+            by_type = self._events_by_type.get(event_type.name, ())
+            by_node = self._events_by_node.get(node_id, ())
+            if len(by_type) <= len(by_node):
+                source = [event for event in by_type if node_id in event.node_ids()]
+            else:
+                source = [event for event in by_node if event.type == event_type.name]
+        elif event_type:
+            source = self._events_by_type.get(event_type.name, ())
+        else:
+            source = self._events_by_node.get(node_id, ())
+        # Events are recorded in timestamp order, so the cutoff is found by bisection.
+        start = bisect_left(source, cutoff_ns, key=attrgetter("ts_ns")) if cutoff_ns is not None else 0
+        return list(islice(source, start, None))
     def run_load_test(self, target_node_type, duration_seconds=60, intensity="medium"):
         logger.info(f"Starting load test on {target_node_type} nodes for {duration_seconds} seconds at {intensity} intensity")
-        target_nodes = [node for node in self.network_nodes if node["type"] == target_node_type]
+        target_nodes = self._nodes_by_type.get(target_node_type, [])
         if not target_nodes:
             logger.warning(f"No nodes found of type {target_node_type}")
             return False
         if intensity == "low":
-            cpu_load = random.uniform(50, 70)
-            memory_load = random.uniform(40, 60)
-            connection_load = random.randint(100, 500)
+            cpu_load = self._rng.uniform(50, 70)
+            memory_load = self._rng.uniform(40, 60)
+            connection_load = self._rng.randint(100, 500)
         elif intensity == "medium":
-            cpu_load = random.uniform(70, 85)
-            memory_load = random.uniform(60, 80)
-            connection_load = random.randint(500, 2000)
+            cpu_load = self._rng.uniform(70, 85)
+            memory_load = self._rng.uniform(60, 80)
+            connection_load = self._rng.randint(500, 2000)
         elif intensity == "high":
-            cpu_load = random.uniform(85, 95)
-            memory_load = random.uniform(80, 95)
-            connection_load = random.randint(2000, 5000)
+            cpu_load = self._rng.uniform(85, 95)
+            memory_load = self._rng.uniform(80, 95)
+            connection_load = self._rng.randint(2000, 5000)
         else:
             logger.error(f"Invalid intensity: {intensity}")
             return False
-        load_test_event = {
-            "id": len(self.events) + 1,
-            "type": "LOAD_TEST",
-            "target_type": target_node_type,
-            "target_nodes": [node["id"] for node in target_nodes],
-            "timestamp": datetime.now().isoformat(),
-            "details": {
-                "duration_seconds": duration_seconds,
-                "intensity": intensity,
-                "cpu_load": cpu_load,
-                "memory_load": memory_load,
-                "connection_load": connection_load
-            }
-        }
-        self.events.append(load_test_event)
-        logger.info(f"Load test started: {json.dumps(load_test_event['details'])}")
-        time.sleep(min(duration_seconds, 5))
+        ts_ns = time.time_ns()
+        load_test_event = Event(id=next(self._event_ids), type="LOAD_TEST", target_type=target_node_type, ts_ns=ts_ns, target_nodes=[node["id"] for node in target_nodes], details={
+            "duration_seconds": duration_seconds,
+            "intensity": intensity,
+            "cpu_load": cpu_load,
+            "memory_load": memory_load,
+            "connection_load": connection_load
+        })
+        self._record_event(load_test_event)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Load test started: %s", _to_json(load_test_event.details))
+        self._stop_evt.wait(min(duration_seconds, 5))
         if intensity == "high":
+            # Exhaustion events for all target nodes are raised in the same tick, so they share one timestamp.
+            ts_ns = time.time_ns()
             for node in target_nodes:
-                if random.random() < 0.7:
-                    self._generate_event(EventType.RESOURCE_EXHAUSTION, node)
-        completion_event = {
-            "id": len(self.events) + 1,
-            "type": "LOAD_TEST_COMPLETED",
-            "target_type": target_node_type,
-            "target_nodes": [node["id"] for node in target_nodes],
-            "timestamp": datetime.now().isoformat(),
-            "details": {
-                "original_test_id": load_test_event["id"],
-                "success": True,
-                "failures": 0,
-                "performance_impact": {
-                    "latency_increase_percent": random.uniform(10, 50),
-                    "throughput_decrease_percent": random.uniform(5, 30),
-                    "error_rate_increase_percent": random.uniform(1, 20)
-                }
+                if self._rng.random() < 0.7:
+                    self._generate_event(EventType.RESOURCE_EXHAUSTION, node, ts_ns=ts_ns)
+        ts_ns = time.time_ns()
+        completion_event = Event(id=next(self._event_ids), type="LOAD_TEST_COMPLETED", target_type=target_node_type, ts_ns=ts_ns, target_nodes=[node["id"] for node in target_nodes], details={
+            "original_test_id": load_test_event.id,
+            "success": True,
+            "failures": 0,
+            "performance_impact": {
+                "latency_increase_percent": self._rng.uniform(10, 50),
+                "throughput_decrease_percent": self._rng.uniform(5, 30),
+                "error_rate_increase_percent": self._rng.uniform(1, 20)
             }
-        }
-        self.events.append(completion_event)
-        logger.info(f"Load test completed: {json.dumps(completion_event['details'])}")
+        })
+        self._record_event(completion_event)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Load test completed: %s", _to_json(completion_event.details))
         return True
     def simulate_failover_scenario(self, node_type):
         logger.info(f"Simulating failover scenario for {node_type} nodes")
-        target_nodes = [node for node in self.network_nodes if node["type"] == node_type]
+        target_nodes = self._nodes_by_type.get(node_type, [])
         if not target_nodes:
             logger.warning(f"No nodes found of type {node_type}")
             return False
-        target_node = random.choice(target_nodes)
+        target_node = self._rng.choice(target_nodes)
         failure_event = self._generate_event(EventType.NODE_FAILURE, target_node)
-        detection_time = random.uniform(1, 5)
+        detection_time = self._rng.uniform(1, 5)
         logger.info(f"Failure detection time: {detection_time:.2f} seconds")
-        time.sleep(min(detection_time, 2))
+        self._stop_evt.wait(min(detection_time, 2))
         failover_event = self._generate_event(EventType.FAILOVER, target_node)
-        failover_time = failover_event["details"]["failover_duration_seconds"]
+        failover_time = failover_event.details["failover_duration_seconds"]
         logger.info(f"Failover time: {failover_time} seconds")
-        time.sleep(min(failover_time, 3))
-        recovery_success = random.random() < 0.9
+        self._stop_evt.wait(min(failover_time, 3))
+        recovery_success = self._rng.random() < 0.9
         recovery_event = self._generate_event(EventType.RECOVERY, target_node)
         scenario_result = {
             "scenario": "Failover",
             "target_node": target_node["id"],
             "target_type": target_node["type"],
             "events": [
-                {"id": failure_event["id"], "type": failure_event["type"]},
-                {"id": failover_event["id"], "type": failover_event["type"]},
-                {"id": recovery_event["id"], "type": recovery_event["type"]}
+                {"id": failure_event.id, "type": failure_event.type},
+                {"id": failover_event.id, "type": failover_event.type},
+                {"id": recovery_event.id, "type": recovery_event.type}
             ],
             "metrics": {
                 "detection_time_seconds": detection_time,
                 "failover_time_seconds": failover_time,
-                "recovery_time_seconds": recovery_event["details"]["recovery_duration_seconds"],
+                "recovery_time_seconds": recovery_event.details["recovery_duration_seconds"],
                 "total_downtime_seconds": detection_time + failover_time,
-                "recovery_success": recovery_event["details"]["success"]
+                "recovery_success": recovery_event.details["success"]
             }
         }
-        logger.info(f"Failover scenario completed: {json.dumps(scenario_result['metrics'])}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Failover scenario completed: %s", _to_json(scenario_result['metrics']))
         return scenario_result 
\ No newline at end of file
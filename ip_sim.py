@@ -1,12 +1,12 @@
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 import random
 import logging
 from datetime import datetime
-from collections import defaultdict
 
 try:
-    from scapy.all import IP, IPv6, TCP, UDP, ICMP, ICMPv6EchoRequest, send, wrpcap
+    from scapy.all import IP, IPv6, TCP, UDP, ICMP, ICMPv6EchoRequest, send, PcapWriter, conf
     SCAPY_AVAILABLE = True
 except ImportError:
     SCAPY_AVAILABLE = False
@@ -18,14 +18,17 @@ class IPTrafficSimulator:
     def __init__(self):
         self.running = False
         self.simulation_interval = 30  # seconds
+        self._rng = random.Random()
+        self._stats_lock = threading.Lock()  # the IPv4, IPv6 and QoS steps update stats from pool threads
+        self.version = 0  # bumped whenever get_status() output may have changed
         self.stats = {
             "ipv4_packets_sent": 0,
             "ipv6_packets_sent": 0,
-            "packets_received": 0,
-            "latency_ms": defaultdict(list),
-            "packet_loss": defaultdict(int),
-            "jitter_ms": defaultdict(list)
+            "packets_received": 0
         }
+        self._pcap4 = None
+        self._pcap6 = None
+        self._l3_sockets = {}  # step name -> persistent scapy L3 socket, one per step since steps run concurrently
         self.network_topology = [
             {"name": "gNB-1", "ipv4": "192.168.1.1", "ipv6": "2001:db8::1"},
             {"name": "gNB-2", "ipv4": "192.168.1.2", "ipv6": "2001:db8::2"},
@@ -37,21 +40,44 @@ class IPTrafficSimulator:
             {"name": "UE-2", "ipv4": "192.168.4.2", "ipv6": "2001:db8:3::2"}
         ]
         self.qos_classes = [
-            {"name": "Conversational", "dscp": 46, "priority": "High"},
-            {"name": "Streaming", "dscp": 34, "priority": "Medium-High"},
-            {"name": "Interactive", "dscp": 26, "priority": "Medium"},
-            {"name": "Background", "dscp": 0, "priority": "Low"}
+            {"name": "Conversational", "dscp": 46, "priority": "High", "rtt_range": (5, 20)},
+            {"name": "Streaming", "dscp": 34, "priority": "Medium-High", "rtt_range": (15, 40)},
+            {"name": "Interactive", "dscp": 26, "priority": "Medium", "rtt_range": (30, 70)},
+            {"name": "Background", "dscp": 0, "priority": "Low", "rtt_range": (50, 150)}
         ]
+        # Per-path stats live in parallel lists indexed by an integer path id: IPv4 pairs at
+        # i*N+j, IPv6 pairs offset by N*N, then one slot per QoS class. Diagonal slots stay empty.
+        self._path_keys = [f"{a['ipv4']}->{b['ipv4']}" for a in self.network_topology for b in self.network_topology]
+        self._ipv6_path_base = len(self._path_keys)
+        self._path_keys += [f"{a['ipv6']}->{b['ipv6']}" for a in self.network_topology for b in self.network_topology]
+        self._qos_path_base = len(self._path_keys)
+        self._path_keys += [f"QoS-{qos_class['name']}" for qos_class in self.qos_classes]
+        path_count = len(self._path_keys)
+        # Running (Welford) means replace sample history: O(1) memory per path and O(paths) analysis.
+        self._latency_count = [0] * path_count
+        self._latency_mean = [0.0] * path_count
+        self._last_latency = [None] * path_count
+        self._jitter_count = [0] * path_count
+        self._jitter_mean = [0.0] * path_count
+        self._sent_count = [0] * path_count  # loss-rate denominator, kept apart from the latency accumulators
+        self._loss_count = [0] * path_count
+        if SCAPY_AVAILABLE:
+            # Layer stacks are built once; each cycle only rewrites addresses and source ports.
+            self._ipv4_templates = [("TCP", IP(ttl=64) / TCP(dport=80)), ("UDP", IP(ttl=64) / UDP(dport=53)), ("ICMP", IP(ttl=64) / ICMP(type=8, code=0))]
+            self._ipv6_templates = [("TCP6", IPv6(hlim=64) / TCP(dport=80)), ("UDP6", IPv6(hlim=64) / UDP(dport=53)), ("ICMPv6", IPv6(hlim=64) / ICMPv6EchoRequest())]
+            self._qos_templates = [IP(tos=qos_class["dscp"] << 2) / UDP(dport=80) for qos_class in self.qos_classes]
     def start(self):
         if self.running:
             return
         self.running = True
+        self.version += 1
         logger.info("Starting IP Traffic Simulation module")
         if not SCAPY_AVAILABLE:
             logger.warning("Scapy not available. Running in limited simulation mode.")
         threading.Thread(target=self._simulation_loop, name="ip-simulation-thread", daemon=True).start()
     def stop(self):
         self.running = False
+        self.version += 1
         logger.info("Stopped IP Traffic Simulation module")
     def get_status(self):
         return {
@@ -61,45 +87,88 @@ class IPTrafficSimulator:
             "ipv6_packets_sent": self.stats["ipv6_packets_sent"],
             "packets_received": self.stats["packets_received"]
         }
+    def _pick_node_pair(self):
+        # Draw dst from the N-1 remaining slots and shift past src instead of filtering the topology.
+        n = len(self.network_topology)
+        i = self._rng.randrange(n)
+        j = self._rng.randrange(n - 1)
+        j += j >= i
+        return self.network_topology[i], self.network_topology[j], i * n + j
+    def _stamp_template(self, packet, src_ip, dst_ip):
+        packet.src = src_ip
+        packet.dst = dst_ip
+        transport = packet.payload
+        if isinstance(transport, (TCP, UDP)):
+            transport.sport = self._rng.randint(1024, 65535)
+        return packet
     def _simulation_loop(self):
         logger.info("Starting IP traffic simulation loop")
-        while self.running:
-            logger.info("Running IP traffic simulation cycle")
-            self._simulate_ipv4_traffic()
-            self._simulate_ipv6_traffic()
-            self._simulate_qos_traffic()
-            self._analyze_traffic_stats()
-            time.sleep(self.simulation_interval)
+        if SCAPY_AVAILABLE:
+            # The loop owns the capture writers so a late cycle after stop() never writes to a closed file.
+            self._pcap4 = PcapWriter("ipv4_simulation.pcap", append=True, sync=False)
+            self._pcap6 = PcapWriter("ipv6_simulation.pcap", append=True, sync=False)
+            self._open_l3_sockets()
+        steps = (self._simulate_ipv4_traffic, self._simulate_ipv6_traffic, self._simulate_qos_traffic)
+        try:
+            with ThreadPoolExecutor(max_workers=len(steps), thread_name_prefix="ip-simulation-step") as pool:
+                while self.running:
+                    logger.info("Running IP traffic simulation cycle")
+                    # The three traffic steps are independent and mostly blocked in send(), so they run concurrently.
+                    for future in [pool.submit(step) for step in steps]:
+                        try:
+                            future.result()
+                        except Exception as e:
+                            logger.error("Error in IP simulation step: %s", e)
+                    for writer in (self._pcap4, self._pcap6):
+                        if writer is not None:
+                            writer.flush()
+                    self.version += 1
+                    self._analyze_traffic_stats()
+                    time.sleep(self.simulation_interval)
+        finally:
+            for writer in (self._pcap4, self._pcap6):
+                if writer is not None:
+                    writer.close()
+            self._pcap4 = self._pcap6 = None
+            for sock in self._l3_sockets.values():
+                sock.close()
+            self._l3_sockets = {}
+    def _open_l3_sockets(self):
+        try:
+            for step, socket_factory in (("ipv4", conf.L3socket), ("ipv6", conf.L3socket6), ("qos", conf.L3socket)):
+                self._l3_sockets[step] = socket_factory()
+        except Exception as e:
+            logger.warning(f"Could not open persistent L3 sockets, sending with per-call sockets: {str(e)}")
+            for sock in self._l3_sockets.values():
+                sock.close()
+            self._l3_sockets = {}
+    def _send_packets(self, step, packets):
+        sock = self._l3_sockets.get(step)
+        if sock is None:
+            send(packets, verbose=0)
+            return
+        for packet in packets:
+            sock.send(packet)
     def _simulate_ipv4_traffic(self):
         logger.info("Simulating IPv4 traffic")
         if not SCAPY_AVAILABLE:
             self._mock_ipv4_simulation()
             return
         try:
-            src_node = random.choice(self.network_topology)
-            dst_node = random.choice([n for n in self.network_topology if n != src_node])
+            src_node, dst_node, pair_id = self._pick_node_pair()
             src_ip = src_node["ipv4"]
             dst_ip = dst_node["ipv4"]
-            logger.info(f"Sending IPv4 packets from {src_node['name']} to {dst_node['name']}")
-            packets = []
-            tcp_packet = IP(src=src_ip, dst=dst_ip, ttl=64) / TCP(sport=random.randint(1024, 65535), dport=80)
-            packets.append(("TCP", tcp_packet))
-            udp_packet = IP(src=src_ip, dst=dst_ip, ttl=64) / UDP(sport=random.randint(1024, 65535), dport=53)
-            packets.append(("UDP", udp_packet))
-            icmp_packet = IP(src=src_ip, dst=dst_ip, ttl=64) / ICMP(type=8, code=0)
-            packets.append(("ICMP", icmp_packet))
-            for packet_type, packet in packets:
-                start_time = time.time()
-                send(packet, verbose=0)
-                response_time = random.uniform(5, 100)
-                logger.info(f"Sent {packet_type} packet: {src_ip} -> {dst_ip}, RTT: {response_time:.2f}ms")
-                self.stats["ipv4_packets_sent"] += 1
-                self.stats["latency_ms"][f"{src_ip}->{dst_ip}"].append(response_time)
-                if random.random() < 0.05:
-                    self.stats["packet_loss"][f"{src_ip}->{dst_ip}"] += 1
-                else:
-                    self.stats["packets_received"] += 1
-            wrpcap("ipv4_simulation.pcap", [p[1] for p in packets], append=True)
+            logger.info("Sending IPv4 packets from %s to %s", src_node['name'], dst_node['name'])
+            packets = self._ipv4_templates
+            raw_packets = [self._stamp_template(p, src_ip, dst_ip) for _, p in packets]
+            self._send_packets("ipv4", raw_packets)
+            self._pcap4.write(raw_packets)
+            for packet_type, _ in packets:
+                response_time = self._rng.uniform(5, 100)
+                logger.info("Sent %s packet: %s -> %s, RTT: %.2fms", packet_type, src_ip, dst_ip, response_time)
+                with self._stats_lock:
+                    self.stats["ipv4_packets_sent"] += 1
+                    self._record_path_sample(pair_id, response_time)
         except Exception as e:
             logger.error(f"Error in IPv4 simulation: {str(e)}")
     def _simulate_ipv6_traffic(self):
@@ -108,30 +177,20 @@ class IPTrafficSimulator:
             self._mock_ipv6_simulation()
             return
         try:
-            src_node = random.choice(self.network_topology)
-            dst_node = random.choice([n for n in self.network_topology if n != src_node])
+            src_node, dst_node, pair_id = self._pick_node_pair()
             src_ip = src_node["ipv6"]
             dst_ip = dst_node["ipv6"]
-            logger.info(f"Sending IPv6 packets from {src_node['name']} to {dst_node['name']}")
-            packets = []
-            tcp_packet = IPv6(src=src_ip, dst=dst_ip, hlim=64) / TCP(sport=random.randint(1024, 65535), dport=80)
-            packets.append(("TCP6", tcp_packet))
-            udp_packet = IPv6(src=src_ip, dst=dst_ip, hlim=64) / UDP(sport=random.randint(1024, 65535), dport=53)
-            packets.append(("UDP6", udp_packet))
-            icmp_packet = IPv6(src=src_ip, dst=dst_ip, hlim=64) / ICMPv6EchoRequest()
-            packets.append(("ICMPv6", icmp_packet))
-            for packet_type, packet in packets:
-                start_time = time.time()
-                send(packet, verbose=0)
-                response_time = random.uniform(5, 100)
-                logger.info(f"Sent {packet_type} packet: {src_ip} -> {dst_ip}, RTT: {response_time:.2f}ms")
-                self.stats["ipv6_packets_sent"] += 1
-                self.stats["latency_ms"][f"{src_ip}->{dst_ip}"].append(response_time)
-                if random.random() < 0.05:
-                    self.stats["packet_loss"][f"{src_ip}->{dst_ip}"] += 1
-                else:
-                    self.stats["packets_received"] += 1
-            wrpcap("ipv6_simulation.pcap", [p[1] for p in packets], append=True)
+            logger.info("Sending IPv6 packets from %s to %s", src_node['name'], dst_node['name'])
+            packets = self._ipv6_templates
+            raw_packets = [self._stamp_template(p, src_ip, dst_ip) for _, p in packets]
+            self._send_packets("ipv6", raw_packets)
+            self._pcap6.write(raw_packets)
+            for packet_type, _ in packets:
+                response_time = self._rng.uniform(5, 100)
+                logger.info("Sent %s packet: %s -> %s, RTT: %.2fms", packet_type, src_ip, dst_ip, response_time)
+                with self._stats_lock:
+                    self.stats["ipv6_packets_sent"] += 1
+                    self._record_path_sample(pair_id + self._ipv6_path_base, response_time)
         except Exception as e:
             logger.error(f"Error in IPv6 simulation: {str(e)}")
     def _simulate_qos_traffic(self):
@@ -140,110 +199,89 @@ class IPTrafficSimulator:
             self._mock_qos_simulation()
             return
         try:
-            src_node = random.choice(self.network_topology)
-            dst_node = random.choice([n for n in self.network_topology if n != src_node])
+            src_node, dst_node, _ = self._pick_node_pair()
             src_ip = src_node["ipv4"]
             dst_ip = dst_node["ipv4"]
-            logger.info(f"Simulating QoS traffic from {src_node['name']} to {dst_node['name']}")
-            for qos_class in self.qos_classes:
-                tos_value = qos_class["dscp"] << 2
-                packet = IP(src=src_ip, dst=dst_ip, tos=tos_value) / UDP(sport=random.randint(1024, 65535), dport=80)
-                send(packet, verbose=0)
-                if qos_class["priority"] == "High":
-                    response_time = random.uniform(5, 20)
-                elif qos_class["priority"] == "Medium-High":
-                    response_time = random.uniform(15, 40)
-                elif qos_class["priority"] == "Medium":
-                    response_time = random.uniform(30, 70)
-                else:
-                    response_time = random.uniform(50, 150)
-                logger.info(f"Sent QoS packet with class {qos_class['name']} (DSCP {qos_class['dscp']}): {src_ip} -> {dst_ip}, RTT: {response_time:.2f}ms")
-                self.stats["ipv4_packets_sent"] += 1
-                self.stats["latency_ms"][f"QoS-{qos_class['name']}"] .append(response_time)
-                if len(self.stats["latency_ms"][f"QoS-{qos_class['name']}"]) > 1:
-                    prev_latency = self.stats["latency_ms"][f"QoS-{qos_class['name']}"][-2]
-                    jitter = abs(response_time - prev_latency)
-                    self.stats["jitter_ms"][f"QoS-{qos_class['name']}"] .append(jitter)
+            logger.info("Simulating QoS traffic from %s to %s", src_node['name'], dst_node['name'])
+            packets = [self._stamp_template(p, src_ip, dst_ip) for p in self._qos_templates]
+            self._send_packets("qos", packets)
+            for qos_path_id, qos_class in enumerate(self.qos_classes, self._qos_path_base):
+                response_time = self._rng.uniform(*qos_class["rtt_range"])
+                logger.info("Sent QoS packet with class %s (DSCP %s): %s -> %s, RTT: %.2fms", qos_class['name'], qos_class['dscp'], src_ip, dst_ip, response_time)
+                with self._stats_lock:
+                    self.stats["ipv4_packets_sent"] += 1
+                    self._record_qos_sample(qos_path_id, response_time)
         except Exception as e:
             logger.error(f"Error in QoS simulation: {str(e)}")
     def _mock_ipv4_simulation(self):
-        src_node = random.choice(self.network_topology)
-        dst_node = random.choice([n for n in self.network_topology if n != src_node])
+        src_node, dst_node, pair_id = self._pick_node_pair()
         src_ip = src_node["ipv4"]
         dst_ip = dst_node["ipv4"]
-        logger.info(f"[MOCK] Sending IPv4 packets from {src_node['name']} to {dst_node['name']}")
+        logger.info("[MOCK] Sending IPv4 packets from %s to %s", src_node['name'], dst_node['name'])
         packet_types = ["TCP", "UDP", "ICMP"]
         for packet_type in packet_types:
-            response_time = random.uniform(5, 100)
-            logger.info(f"[MOCK] Sent {packet_type} packet: {src_ip} -> {dst_ip}, RTT: {response_time:.2f}ms")
-            self.stats["ipv4_packets_sent"] += 1
-            self.stats["latency_ms"][f"{src_ip}->{dst_ip}"].append(response_time)
-            if random.random() < 0.05:
-                self.stats["packet_loss"][f"{src_ip}->{dst_ip}"] += 1
-            else:
-                self.stats["packets_received"] += 1
+            response_time = self._rng.uniform(5, 100)
+            logger.info("[MOCK] Sent %s packet: %s -> %s, RTT: %.2fms", packet_type, src_ip, dst_ip, response_time)
+            with self._stats_lock:
+                self.stats["ipv4_packets_sent"] += 1
+                self._record_path_sample(pair_id, response_time)
     def _mock_ipv6_simulation(self):
-        src_node = random.choice(self.network_topology)
-        dst_node = random.choice([n for n in self.network_topology if n != src_node])
+        src_node, dst_node, pair_id = self._pick_node_pair()
         src_ip = src_node["ipv6"]
         dst_ip = dst_node["ipv6"]
-        logger.info(f"[MOCK] Sending IPv6 packets from {src_node['name']} to {dst_node['name']}")
+        logger.info("[MOCK] Sending IPv6 packets from %s to %s", src_node['name'], dst_node['name'])
         packet_types = ["TCP6", "UDP6", "ICMPv6"]
         for packet_type in packet_types:
-            response_time = random.uniform(5, 100)
-            logger.info(f"[MOCK] Sent {packet_type} packet: {src_ip} -> {dst_ip}, RTT: {response_time:.2f}ms")
-            self.stats["ipv6_packets_sent"] += 1
-            self.stats["latency_ms"][f"{src_ip}->{dst_ip}"].append(response_time)
-            if random.random() < 0.05:
-                self.stats["packet_loss"][f"{src_ip}->{dst_ip}"] += 1
-            else:
-                self.stats["packets_received"] += 1
+            response_time = self._rng.uniform(5, 100)
+            logger.info("[MOCK] Sent %s packet: %s -> %s, RTT: %.2fms", packet_type, src_ip, dst_ip, response_time)
+            with self._stats_lock:
+                self.stats["ipv6_packets_sent"] += 1
+                self._record_path_sample(pair_id + self._ipv6_path_base, response_time)
     def _mock_qos_simulation(self):
-        src_node = random.choice(self.network_topology)
-        dst_node = random.choice([n for n in self.network_topology if n != src_node])
+        src_node, dst_node, _ = self._pick_node_pair()
         src_ip = src_node["ipv4"]
         dst_ip = dst_node["ipv4"]
-        logger.info(f"[MOCK] Simulating QoS traffic from {src_node['name']} to {dst_node['name']}")
-        for qos_class in self.qos_classes:
-            if qos_class["priority"] == "High":
-                response_time = random.uniform(5, 20)
-            elif qos_class["priority"] == "Medium-High":
-                response_time = random.uniform(15, 40)
-            elif qos_class["priority"] == "Medium":
-                response_time = random.uniform(30, 70)
-            else:
-                response_time = random.uniform(50, 150)
-            logger.info(f"[MOCK] Sent QoS packet with class {qos_class['name']} (DSCP {qos_class['dscp']}): {src_ip} -> {dst_ip}, RTT: {response_time:.2f}ms")
-            self.stats["ipv4_packets_sent"] += 1
-            self.stats["latency_ms"][f"QoS-{qos_class['name']}"] .append(response_time)
-            if len(self.stats["latency_ms"][f"QoS-{qos_class['name']}"]) > 1:
-                prev_latency = self.stats["latency_ms"][f"QoS-{qos_class['name']}"][-2]
-                jitter = abs(response_time - prev_latency)
-                self.stats["jitter_ms"][f"QoS-{qos_class['name']}"] .append(jitter)
+        logger.info("[MOCK] Simulating QoS traffic from %s to %s", src_node['name'], dst_node['name'])
+        for qos_path_id, qos_class in enumerate(self.qos_classes, self._qos_path_base):
+            response_time = self._rng.uniform(*qos_class["rtt_range"])
+            logger.info("[MOCK] Sent QoS packet with class %s (DSCP %s): %s -> %s, RTT: %.2fms", qos_class['name'], qos_class['dscp'], src_ip, dst_ip, response_time)
+            with self._stats_lock:
+                self.stats["ipv4_packets_sent"] += 1
+                self._record_qos_sample(qos_path_id, response_time)
+    def _record_latency(self, path_id, response_time):
+        n = self._latency_count[path_id] + 1
+        self._latency_count[path_id] = n
+        self._latency_mean[path_id] += (response_time - self._latency_mean[path_id]) / n
+    def _record_path_sample(self, path_id, response_time):
+        self._record_latency(path_id, response_time)
+        self._sent_count[path_id] += 1
+        if self._rng.random() < 0.05:
+            self._loss_count[path_id] += 1
+        else:
+            self.stats["packets_received"] += 1
+    def _record_qos_sample(self, path_id, response_time):
+        previous = self._last_latency[path_id]
+        if previous is not None:
+            n = self._jitter_count[path_id] + 1
+            self._jitter_count[path_id] = n
+            self._jitter_mean[path_id] += (abs(response_time - previous) - self._jitter_mean[path_id]) / n
+        self._last_latency[path_id] = response_time
+        self._record_latency(path_id, response_time)
     def _analyze_traffic_stats(self):
         logger.info("Analyzing traffic statistics")
-        avg_latency = {}
-        for path, latencies in self.stats["latency_ms"].items():
-            if latencies:
-                avg_latency[path] = sum(latencies) / len(latencies)
-        avg_jitter = {}
-        for qos_class, jitters in self.stats["jitter_ms"].items():
-            if jitters:
-                avg_jitter[qos_class] = sum(jitters) / len(jitters)
-        packet_loss_rate = {}
-        for path, loss_count in self.stats["packet_loss"].items():
-            total_sent = len(self.stats["latency_ms"].get(path, []))
-            if total_sent > 0:
-                packet_loss_rate[path] = (loss_count / total_sent) * 100
+        path_keys = self._path_keys
+        avg_latency = {path_keys[path_id]: mean for path_id, (n, mean) in enumerate(zip(self._latency_count, self._latency_mean)) if n}
+        avg_jitter = {path_keys[path_id]: mean for path_id, (n, mean) in enumerate(zip(self._jitter_count, self._jitter_mean)) if n}
+        packet_loss_rate = {path_keys[path_id]: (loss_count / total_sent) * 100 for path_id, (loss_count, total_sent) in enumerate(zip(self._loss_count, self._sent_count)) if loss_count and total_sent > 0}
         logger.info(f"Total IPv4 packets sent: {self.stats['ipv4_packets_sent']}")
         logger.info(f"Total IPv6 packets sent: {self.stats['ipv6_packets_sent']}")
         logger.info(f"Total packets received: {self.stats['packets_received']}")
         for path, latency in avg_latency.items():
-            logger.info(f"Average latency for {path}: {latency:.2f}ms")
+            logger.info("Average latency for %s: %.2fms", path, latency)
         for qos_class, jitter in avg_jitter.items():
-            logger.info(f"Average jitter for {qos_class}: {jitter:.2f}ms")
+            logger.info("Average jitter for %s: %.2fms", qos_class, jitter)
         for path, loss_rate in packet_loss_rate.items():
-            logger.info(f"Packet loss rate for {path}: {loss_rate:.2f}%")
+            logger.info("Packet loss rate for %s: %.2f%%", path, loss_rate)
         return {
             "avg_latency": avg_latency,
             "avg_jitter": avg_jitter,
@@ -2,17 +2,50 @@ import threading
 import time
 import random
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from collections import defaultdict, deque
+from bisect import bisect_left
+from operator import itemgetter
 import json
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 logger = logging.getLogger("OAM-Platform")
 
+# (kpi_id, low, high) uniform ranges drawn for every node each collection cycle.
+_KPI_SAMPLE_RANGES = (
+    ("cpu_utilization", 20, 95),
+    ("memory_utilization", 30, 90),
+    ("service_latency", 10, 200),
+    ("error_rate", 0, 10),
+    ("throughput", 100, 2000),
+    ("connection_success_rate", 90, 100),
+)
+if NUMPY_AVAILABLE:
+    _KPI_SAMPLE_LOW = np.array([low for _, low, _ in _KPI_SAMPLE_RANGES], dtype=float)
+    _KPI_SAMPLE_HIGH = np.array([high for _, _, high in _KPI_SAMPLE_RANGES], dtype=float)
+
+def _iso_from_ns(ts_ns):
+    return datetime.fromtimestamp(ts_ns / 1e9).isoformat()
+
 class KPIMonitoring:
     """KPI Monitoring Framework for 5G/LTE networks"""
     def __init__(self):
         self.running = False
         self.collection_interval = 60  # seconds
+        self._rng = random.Random()
+        self._np_rng = np.random.default_rng() if NUMPY_AVAILABLE else None
+        self.version = 0  # bumped whenever new KPI samples are stored
         self.kpi_definitions = [
             {"id": "node_availability", "name": "Node Availability", "description": "Percentage of time a node is available", "unit": "%", "target": 99.99, "warning_threshold": 99.9, "critical_threshold": 99.5, "category": "availability"},
             {"id": "service_latency", "name": "Service Latency", "description": "Average latency for service requests", "unit": "ms", "target": 50, "warning_threshold": 100, "critical_threshold": 200, "category": "performance"},
@@ -23,7 +56,21 @@ class KPIMonitoring:
             {"id": "connection_success_rate", "name": "Connection Success Rate", "description": "Percentage of successful connection attempts", "unit": "%", "target": 99.9, "warning_threshold": 99.0, "critical_threshold": 95.0, "category": "quality"},
             {"id": "recovery_time", "name": "Recovery Time", "description": "Average time to recover from failures", "unit": "seconds", "target": 30, "warning_threshold": 60, "critical_threshold": 300, "category": "availability"}
         ]
-        self.kpi_data = {kpi["id"]: defaultdict(lambda: deque(maxlen=1000)) for kpi in self.kpi_definitions}
+        # (definition, sign, screen, critical) rows so analysis skips per-sample dict and category lookups.
+        # sign is -1 where lower values are bad, and both bounds are pre-multiplied by it, so every check is
+        # sign * value > bound. screen is the looser of the two thresholds: values that do not cross it are OK.
+        self._kpi_thresholds = []
+        for kpi in self.kpi_definitions:
+            sign = -1 if kpi["category"] in ("availability", "quality") else 1
+            critical = sign * kpi["critical_threshold"]
+            self._kpi_thresholds.append((kpi, sign, min(sign * kpi["warning_threshold"], critical), critical))
+        # One (epoch_ns, values) row per node per cycle, values ordered like kpi_definitions with None for KPIs
+        # not sampled that cycle. The {"timestamp", "value"} dicts with ISO strings are only built for callers.
+        self._kpi_index = {kpi["id"]: index for index, kpi in enumerate(self.kpi_definitions)}
+        self._sample_columns = [(self._kpi_index[kpi_id], low, high) for kpi_id, low, high in _KPI_SAMPLE_RANGES]
+        self._node_rows = defaultdict(lambda: deque(maxlen=1000))
+        self._latest_samples = defaultdict(lambda: [None] * len(self.kpi_definitions))  # node_id -> latest (epoch_ns, value) per KPI
+        self._sample_count = 0
         self.network_nodes = [
             {"id": "gnb-001", "type": "gNB", "ip": "10.0.1.1", "status": "active"},
             {"id": "gnb-002", "type": "gNB", "ip": "10.0.1.2", "status": "active"},
@@ -46,129 +93,129 @@ class KPIMonitoring:
             "status": "running" if self.running else "stopped",
             "kpi_count": len(self.kpi_definitions),
             "node_count": len(self.network_nodes),
-            "data_points": sum(len(data) for kpi_id, node_data in self.kpi_data.items() for node_id, data in node_data.items())
+            "data_points": self._sample_count
         }
     def _collection_loop(self):
         logger.info("Starting KPI collection loop")
         while self.running:
             logger.info("Collecting KPI data")
-            for node in self.network_nodes:
-                self._collect_node_kpis(node)
+            timestamp = time.time_ns()  # one timestamp for every node in this cycle
+            if NUMPY_AVAILABLE:
+                # One (node, KPI) uniform draw covers the whole cycle; each node gets its row.
+                batch = self._np_rng.uniform(_KPI_SAMPLE_LOW, _KPI_SAMPLE_HIGH, size=(len(self.network_nodes), len(_KPI_SAMPLE_RANGES))).tolist()
+                for node, samples in zip(self.network_nodes, batch):
+                    self._collect_node_kpis(node, timestamp, samples)
+            else:
+                for node in self.network_nodes:
+                    self._collect_node_kpis(node, timestamp)
             self._analyze_kpi_data()
             time.sleep(self.collection_interval)
-    def _collect_node_kpis(self, node):
+    def _collect_node_kpis(self, node, timestamp=None, samples=None):
         node_id = node["id"]
-        timestamp = datetime.now().isoformat()
-        availability = 100.0 if node["status"] == "active" else 0.0
-        self.kpi_data["node_availability"][node_id].append({"timestamp": timestamp, "value": availability})
-        cpu_util = random.uniform(20, 95)
-        self.kpi_data["cpu_utilization"][node_id].append({"timestamp": timestamp, "value": cpu_util})
-        memory_util = random.uniform(30, 90)
-        self.kpi_data["memory_utilization"][node_id].append({"timestamp": timestamp, "value": memory_util})
-        latency = random.uniform(10, 200)
-        self.kpi_data["service_latency"][node_id].append({"timestamp": timestamp, "value": latency})
-        error_rate = random.uniform(0, 10)
-        self.kpi_data["error_rate"][node_id].append({"timestamp": timestamp, "value": error_rate})
-        throughput = random.uniform(100, 2000)
-        self.kpi_data["throughput"][node_id].append({"timestamp": timestamp, "value": throughput})
-        success_rate = random.uniform(90, 100)
-        self.kpi_data["connection_success_rate"][node_id].append({"timestamp": timestamp, "value": success_rate})
-        if node["status"] == "active" and random.random() < 0.1:
-            recovery_time = random.uniform(10, 500)
-            self.kpi_data["recovery_time"][node_id].append({"timestamp": timestamp, "value": recovery_time})
-        logger.info(f"Collected KPI data for node {node_id}")
+        if timestamp is None:
+            timestamp = time.time_ns()
+        uniform = self._rng.uniform
+        values = [None] * len(self.kpi_definitions)
+        values[self._kpi_index["node_availability"]] = 100.0 if node["status"] == "active" else 0.0
+        if samples is None:
+            samples = [uniform(low, high) for _, low, high in self._sample_columns]
+        for (index, _, _), value in zip(self._sample_columns, samples):
+            values[index] = value
+        if node["status"] == "active" and self._rng.random() < 0.1:
+            values[self._kpi_index["recovery_time"]] = uniform(10, 500)
+        rows = self._node_rows[node_id]
+        if len(rows) == rows.maxlen:
+            evicted = rows[0][1]
+            self._sample_count -= len(evicted) - evicted.count(None)
+        rows.append((timestamp, tuple(values)))
+        latest = self._latest_samples[node_id]
+        for index, value in enumerate(values):
+            if value is not None:
+                latest[index] = (timestamp, value)
+        self._sample_count += len(values) - values.count(None)
+        self.version += 1
+        logger.info("Collected KPI data for node %s", node_id)
     def _analyze_kpi_data(self):
         logger.info("Analyzing KPI data")
         issues = []
-        for kpi in self.kpi_definitions:
-            kpi_id = kpi["id"]
-            warning_threshold = kpi["warning_threshold"]
-            critical_threshold = kpi["critical_threshold"]
-            for node_id, data_points in self.kpi_data[kpi_id].items():
-                if not data_points:
-                    continue
-                latest = data_points[-1]
-                value = latest["value"]
-                if kpi["category"] in ["availability", "quality"]:
-                    if value < critical_threshold:
-                        severity = "CRITICAL"
-                    elif value < warning_threshold:
-                        severity = "WARNING"
-                    else:
-                        severity = "OK"
-                else:
-                    if value > critical_threshold:
-                        severity = "CRITICAL"
-                    elif value > warning_threshold:
-                        severity = "WARNING"
-                    else:
-                        severity = "OK"
-                if severity != "OK":
-                    issues.append({
-                        "node_id": node_id,
-                        "kpi_id": kpi_id,
-                        "kpi_name": kpi["name"],
-                        "value": value,
-                        "unit": kpi["unit"],
-                        "severity": severity,
-                        "timestamp": latest["timestamp"]
-                    })
+        for index, (kpi, sign, screen_threshold, critical_threshold) in enumerate(self._kpi_thresholds):
+            # Screen every node's latest sample in one pass; only breaches are graded.
+            breaches = [(node_id, latest[index]) for node_id, latest in self._latest_samples.items() if latest[index] is not None and sign * latest[index][1] > screen_threshold]
+            for node_id, (timestamp, value) in breaches:
+                critical = sign * value > critical_threshold
+                issues.append({
+                    "node_id": node_id,
+                    "kpi_id": kpi["id"],
+                    "kpi_name": kpi["name"],
+                    "value": value,
+                    "unit": kpi["unit"],
+                    "severity": "CRITICAL" if critical else "WARNING",
+                    "timestamp": _iso_from_ns(timestamp)
+                })
         if issues:
             logger.warning(f"Found {len(issues)} KPI issues")
             for issue in issues:
-                logger.warning(f"KPI Issue: {issue['severity']} - {issue['kpi_name']} on {issue['node_id']}: {issue['value']}{issue['unit']}")
+                logger.warning("KPI Issue: %s - %s on %s: %s%s", issue['severity'], issue['kpi_name'], issue['node_id'], issue['value'], issue['unit'])
         else:
             logger.info("No KPI issues found")
         return issues
     def get_kpi_data(self, kpi_id=None, node_id=None, time_range=None):
-        result = {}
+        return {kpi_id: {node_id: [{"timestamp": _iso_from_ns(ts_ns), "value": value} for ts_ns, value in points] for node_id, points in node_data.items()} for kpi_id, node_data in self._select_samples(kpi_id, node_id, time_range).items()}
+    def _select_samples(self, kpi_id=None, node_id=None, time_range=None):
         if kpi_id:
-            if kpi_id not in self.kpi_data:
+            if kpi_id not in self._kpi_index:
                 return {}
-            kpi_data = {kpi_id: self.kpi_data[kpi_id]}
+            kpi_ids = [kpi_id]
         else:
-            kpi_data = self.kpi_data
-        for kpi_id, node_data in kpi_data.items():
-            result[kpi_id] = {}
-            if node_id:
-                if node_id not in node_data:
-                    continue
-                filtered_node_data = {node_id: node_data[node_id]}
-            else:
-                filtered_node_data = node_data
-            for node_id, data_points in filtered_node_data.items():
-                if time_range:
-                    cutoff_time = datetime.now() - timedelta(seconds=time_range)
-                    cutoff_str = cutoff_time.isoformat()
-                    filtered_data = [dp for dp in data_points if dp["timestamp"] >= cutoff_str]
-                else:
-                    filtered_data = list(data_points)
-                if filtered_data:
-                    result[kpi_id][node_id] = filtered_data
+            kpi_ids = list(self._kpi_index)
+        result = {selected_kpi: {} for selected_kpi in kpi_ids}
+        if node_id:
+            if node_id not in self._node_rows:
+                return result
+            node_rows = {node_id: self._node_rows[node_id]}
+        else:
+            node_rows = self._node_rows
+        cutoff_ns = time.time_ns() - int(time_range * 1_000_000_000) if time_range else None
+        for selected_node, rows in node_rows.items():
+            # Copy first: the collection thread appends to the live deque while we read it.
+            rows = list(rows)
+            if cutoff_ns is not None:
+                # Rows are appended in time order, so the cutoff is found by bisection.
+                rows = rows[bisect_left(rows, cutoff_ns, key=itemgetter(0)):]
+            for selected_kpi in kpi_ids:
+                index = self._kpi_index[selected_kpi]
+                points = [(ts_ns, values[index]) for ts_ns, values in rows if values[index] is not None]
+                if points:
+                    result[selected_kpi][selected_node] = points
         return result
     def get_kpi_summary(self, kpi_id=None, node_id=None, time_range=None):
-        data = self.get_kpi_data(kpi_id, node_id, time_range)
+        data = self._select_samples(kpi_id, node_id, time_range)
         summary = {}
         for kpi_id, node_data in data.items():
             summary[kpi_id] = {}
             for node_id, data_points in node_data.items():
                 if not data_points:
                     continue
-                values = [dp["value"] for dp in data_points]
+                latest_timestamp, latest = data_points[-1]
+                values = [value for _, value in data_points]
                 summary[kpi_id][node_id] = {
                     "min": min(values),
                     "max": max(values),
                     "avg": sum(values) / len(values),
                     "count": len(values),
-                    "latest": data_points[-1]["value"],
-                    "latest_timestamp": data_points[-1]["timestamp"]
+                    "latest": latest,
+                    "latest_timestamp": _iso_from_ns(latest_timestamp)
                 }
         return summary
     def export_kpi_data(self, file_path, kpi_id=None, node_id=None, time_range=None):
         data = self.get_kpi_data(kpi_id, node_id, time_range)
         try:
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            if ORJSON_AVAILABLE:
+                with open(file_path, 'wb') as f:
+                    f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(file_path, 'w') as f:
+                    json.dump(data, f, indent=2)
             logger.info(f"Exported KPI data to {file_path}")
             return True
         except Exception as e:
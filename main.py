@@ -1,7 +1,7 @@
 import sys
-import time
+import threading
 import logging
-from platform import OAMPlatform
+from oam_platform import OAMPlatform
 
 logger = logging.getLogger("OAM-Platform")
 
@@ -12,8 +12,7 @@ def main():
         platform.start()
         logger.info("Platform started successfully")
         logger.info("Press Ctrl+C to stop the platform")
-        while True:
-            time.sleep(1)
+        threading.Event().wait()  # block until Ctrl+C instead of waking every second
     except KeyboardInterrupt:
         logger.info("Stopping platform due to user interrupt")
         platform.stop()
@@ -1,12 +1,46 @@
 import threading
-import time
 import random
 import logging
+import re
+import heapq
+import time
 from datetime import datetime
 from enum import Enum
+from dataclasses import dataclass
+from itertools import count
+from collections import deque
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 logger = logging.getLogger("OAM-Platform")
 
+_NODE_ACTIVE = 0
+_NODE_DOWN = 1
+_RECOVERY_PROBABILITY = 0.3
+_MAX_CLEARED_ALARMS = 10_000
+
+def _build_pattern_matcher(patterns):
+    # Returns a function mapping lowercased text to the sorted indices of the patterns it contains,
+    # scanning the text once instead of once per pattern.
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for index, pattern in enumerate(patterns):
+            automaton.add_word(pattern, index)
+        automaton.make_automaton()
+        return lambda text: sorted({index for _, index in automaton.iter(text)})
+    regex = re.compile("|".join(f"({re.escape(pattern)})" for pattern in patterns))
+    return lambda text: sorted({match.lastindex - 1 for match in regex.finditer(text)})
+
 class AlarmSeverity(Enum):
     CRITICAL = 1
     MAJOR = 2
@@ -23,152 +57,234 @@ class AlarmType(Enum):
     ENVIRONMENTAL = 5
     SECURITY = 6
 
+@dataclass(slots=True)
+class Alarm:
+    """Raised alarm record"""
+    id: int
+    node_id: str
+    type: str
+    severity: str
+    description: str
+    raised_time: str
+    status: str = "active"
+    cleared_time: str | None = None
+    def to_dict(self):
+        alarm = {"id": self.id, "node_id": self.node_id, "type": self.type, "severity": self.severity, "description": self.description, "raised_time": self.raised_time, "status": self.status}
+        if self.cleared_time is not None:
+            alarm["cleared_time"] = self.cleared_time
+        return alarm
+
+_TYPE_NAMES = {alarm_type: alarm_type.name for alarm_type in AlarmType}
+_SEVERITY_NAMES = {severity: severity.name for severity in AlarmSeverity}
+
+# fault type -> (alarm type, severity, description template, marks the node down)
+_FAULT_SPEC = {
+    "node_down": (AlarmType.EQUIPMENT, AlarmSeverity.CRITICAL, "Node {id} is down", True),
+    "service_timeout": (AlarmType.QUALITY_OF_SERVICE, AlarmSeverity.MAJOR, "Service timeout on {id}", False),
+    "memory_overflow": (AlarmType.PROCESSING_ERROR, AlarmSeverity.MAJOR, "Memory overflow on {id}", False),
+    "connection_failure": (AlarmType.COMMUNICATIONS, AlarmSeverity.MINOR, "Connection failure on {id}", False),
+    "authentication_failure": (AlarmType.SECURITY, AlarmSeverity.WARNING, "Authentication failure on {id}", False),
+}
+
+# Health metrics in column order: (sample low, sample high, alarm limit, alarm type, severity, description template)
+_HEALTH_METRICS = (
+    (10, 95, 90, AlarmType.PROCESSING_ERROR, AlarmSeverity.MAJOR, "High CPU usage: {:.1f}%"),
+    (20, 90, 85, AlarmType.PROCESSING_ERROR, AlarmSeverity.WARNING, "High memory usage: {:.1f}%"),
+    (30, 85, 80, AlarmType.EQUIPMENT, AlarmSeverity.MINOR, "High disk usage: {:.1f}%"),
+)
+if NUMPY_AVAILABLE:
+    _HEALTH_LOW, _HEALTH_HIGH, _HEALTH_LIMIT = (np.array(column, dtype=float) for column in list(zip(*_HEALTH_METRICS))[:3])
+
+_FAULT_TYPES = (
+    {"type": "node_down", "probability": 0.05},
+    {"type": "service_timeout", "probability": 0.1},
+    {"type": "memory_overflow", "probability": 0.07},
+    {"type": "connection_failure", "probability": 0.15},
+    {"type": "authentication_failure", "probability": 0.03},
+)
+if NUMPY_AVAILABLE:
+    _FAULT_PROBABILITIES = np.array([fault["probability"] for fault in _FAULT_TYPES])
+
+_LOG_TYPES = (
+    "INFO: Normal operation",
+    "INFO: Service started",
+    "INFO: Connection established",
+    "WARNING: High resource usage",
+    "WARNING: Authentication failed",
+    "ERROR: Connection timed out",
+    "ERROR: Service unavailable",
+    "CRITICAL: Out of memory",
+    "CRITICAL: Temperature exceeds threshold",
+)
+
+_LOG_PATTERNS = (
+    {"pattern": "authentication failed", "alarm_type": AlarmType.SECURITY, "severity": AlarmSeverity.WARNING},
+    {"pattern": "connection timed out", "alarm_type": AlarmType.COMMUNICATIONS, "severity": AlarmSeverity.MINOR},
+    {"pattern": "service unavailable", "alarm_type": AlarmType.QUALITY_OF_SERVICE, "severity": AlarmSeverity.MAJOR},
+    {"pattern": "out of memory", "alarm_type": AlarmType.PROCESSING_ERROR, "severity": AlarmSeverity.CRITICAL},
+    {"pattern": "temperature exceeds threshold", "alarm_type": AlarmType.ENVIRONMENTAL, "severity": AlarmSeverity.MAJOR},
+)
+_match_log_patterns = _build_pattern_matcher([pattern["pattern"] for pattern in _LOG_PATTERNS])
+
 class OAMAutomation:
     """OA&M Automation module for 5G/LTE networks"""
     def __init__(self):
         self.running = False
+        self._stop_evt = threading.Event()
+        self._rng = random.Random()
+        self._np_rng = np.random.default_rng() if NUMPY_AVAILABLE else None
         self.health_check_interval = 60  # seconds
         self.fault_gen_interval = 300  # seconds
         self.log_parse_interval = 30  # seconds
         self.alarms = {}
-        self.alarm_id_counter = 1
-        self.network_nodes = [
-            {"id": "gnb-001", "type": "gNB", "ip": "10.0.1.1", "status": "active"},
-            {"id": "gnb-002", "type": "gNB", "ip": "10.0.1.2", "status": "active"},
-            {"id": "amf-001", "type": "AMF", "ip": "10.0.2.1", "status": "active"},
-            {"id": "smf-001", "type": "SMF", "ip": "10.0.2.2", "status": "active"},
-            {"id": "upf-001", "type": "UPF", "ip": "10.0.3.1", "status": "active"},
-            {"id": "pcf-001", "type": "PCF", "ip": "10.0.3.2", "status": "active"},
-        ]
+        self._alarm_ids = count(1)
+        self._lock = threading.Lock()  # guards the alarm table between the scheduler thread and readers
+        self._active_alarm_ids = {}  # insertion-ordered set of active alarm ids, so filtered results keep raise order
+        self._cleared_order = deque(maxlen=_MAX_CLEARED_ALARMS)  # cleared alarm ids, oldest first; evicted from alarms past the cap
+        self._node_down_alarms = {}  # node_id -> ids of "node down" alarms still waiting for recovery
+        self.version = 0  # bumped whenever the alarm table changes
+        # Nodes are held as parallel columns; status is one byte per node (_NODE_ACTIVE / _NODE_DOWN).
+        self.node_ids = ["gnb-001", "gnb-002", "amf-001", "smf-001", "upf-001", "pcf-001"]
+        self.node_types = ["gNB", "gNB", "AMF", "SMF", "UPF", "PCF"]
+        self.node_ips = ["10.0.1.1", "10.0.1.2", "10.0.2.1", "10.0.2.2", "10.0.3.1", "10.0.3.2"]
+        self.node_status = bytearray(len(self.node_ids))
     def start(self):
         if self.running:
             return
         self.running = True
+        self._stop_evt.clear()
         logger.info("Starting OA&M Automation module")
-        threading.Thread(target=self._health_check_loop, name="health-check-thread", daemon=True).start()
-        threading.Thread(target=self._fault_generation_loop, name="fault-gen-thread", daemon=True).start()
-        threading.Thread(target=self._log_parsing_loop, name="log-parse-thread", daemon=True).start()
+        threading.Thread(target=self._scheduler_loop, name="oam-scheduler-thread", daemon=True).start()
     def stop(self):
         self.running = False
+        self._stop_evt.set()
         logger.info("Stopped OA&M Automation module")
     def get_status(self):
         return {
             "status": "running" if self.running else "stopped",
-            "active_alarms": len(self.alarms),
-            "network_nodes": len(self.network_nodes),
-            "healthy_nodes": sum(1 for node in self.network_nodes if node["status"] == "active")
+            "active_alarms": len(self._active_alarm_ids),
+            "network_nodes": len(self.node_ids),
+            "healthy_nodes": self.node_status.count(_NODE_ACTIVE)
         }
-    def _health_check_loop(self):
-        logger.info("Starting health check loop")
-        while self.running:
-            logger.info("Performing health check on network nodes")
-            for node in self.network_nodes:
-                cpu_usage = random.uniform(10, 95)
-                memory_usage = random.uniform(20, 90)
-                disk_usage = random.uniform(30, 85)
-                logger.info(f"Node {node['id']} health: CPU={cpu_usage:.1f}%, Memory={memory_usage:.1f}%, Disk={disk_usage:.1f}%")
-                if cpu_usage > 90:
-                    self._create_alarm(node_id=node["id"], alarm_type=AlarmType.PROCESSING_ERROR, severity=AlarmSeverity.MAJOR, description=f"High CPU usage: {cpu_usage:.1f}%")
-                if memory_usage > 85:
-                    self._create_alarm(node_id=node["id"], alarm_type=AlarmType.PROCESSING_ERROR, severity=AlarmSeverity.WARNING, description=f"High memory usage: {memory_usage:.1f}%")
-                if disk_usage > 80:
-                    self._create_alarm(node_id=node["id"], alarm_type=AlarmType.EQUIPMENT, severity=AlarmSeverity.MINOR, description=f"High disk usage: {disk_usage:.1f}%")
-            time.sleep(self.health_check_interval)
-    def _fault_generation_loop(self):
-        logger.info("Starting fault generation loop")
-        fault_types = [
-            {"type": "node_down", "probability": 0.05},
-            {"type": "service_timeout", "probability": 0.1},
-            {"type": "memory_overflow", "probability": 0.07},
-            {"type": "connection_failure", "probability": 0.15},
-            {"type": "authentication_failure", "probability": 0.03},
-        ]
+    def _scheduler_loop(self):
+        logger.info("Starting OA&M scheduler loop")
+        jobs = [(self._do_health_check, "health_check_interval"), (self._do_fault_generation, "fault_gen_interval"), (self._do_log_parsing, "log_parse_interval")]
+        # Min-heap of (next run, job index); every job runs once at start-up, then its interval after each tick finishes.
+        now = time.monotonic()
+        schedule = [(now, index) for index in range(len(jobs))]
         while self.running:
-            logger.info("Checking for random fault generation")
-            for node in self.network_nodes:
-                for fault in fault_types:
-                    if random.random() < fault["probability"]:
-                        logger.info(f"Generating {fault['type']} fault for node {node['id']}")
-                        if fault["type"] == "node_down":
-                            node["status"] = "down"
-                            self._create_alarm(node_id=node["id"], alarm_type=AlarmType.EQUIPMENT, severity=AlarmSeverity.CRITICAL, description=f"Node {node['id']} is down")
-                        elif fault["type"] == "service_timeout":
-                            self._create_alarm(node_id=node["id"], alarm_type=AlarmType.QUALITY_OF_SERVICE, severity=AlarmSeverity.MAJOR, description=f"Service timeout on {node['id']}")
-                        elif fault["type"] == "memory_overflow":
-                            self._create_alarm(node_id=node["id"], alarm_type=AlarmType.PROCESSING_ERROR, severity=AlarmSeverity.MAJOR, description=f"Memory overflow on {node['id']}")
-                        elif fault["type"] == "connection_failure":
-                            self._create_alarm(node_id=node["id"], alarm_type=AlarmType.COMMUNICATIONS, severity=AlarmSeverity.MINOR, description=f"Connection failure on {node['id']}")
-                        elif fault["type"] == "authentication_failure":
-                            self._create_alarm(node_id=node["id"], alarm_type=AlarmType.SECURITY, severity=AlarmSeverity.WARNING, description=f"Authentication failure on {node['id']}")
-            for node in self.network_nodes:
-                if node["status"] == "down" and random.random() < 0.3:
-                    logger.info(f"Node {node['id']} recovered")
-                    node["status"] = "active"
-                    for alarm_id, alarm in list(self.alarms.items()):
-                        if (alarm["node_id"] == node["id"] and alarm["description"] == f"Node {node['id']} is down"):
-                            self._clear_alarm(alarm_id)
-            time.sleep(self.fault_gen_interval)
-    def _log_parsing_loop(self):
-        logger.info("Starting log parsing loop")
-        log_patterns = [
-            {"pattern": "authentication failed", "alarm_type": AlarmType.SECURITY, "severity": AlarmSeverity.WARNING},
-            {"pattern": "connection timed out", "alarm_type": AlarmType.COMMUNICATIONS, "severity": AlarmSeverity.MINOR},
-            {"pattern": "service unavailable", "alarm_type": AlarmType.QUALITY_OF_SERVICE, "severity": AlarmSeverity.MAJOR},
-            {"pattern": "out of memory", "alarm_type": AlarmType.PROCESSING_ERROR, "severity": AlarmSeverity.CRITICAL},
-            {"pattern": "temperature exceeds threshold", "alarm_type": AlarmType.ENVIRONMENTAL, "severity": AlarmSeverity.MAJOR},
-        ]
-        while self.running:
-            for _ in range(random.randint(5, 15)):
-                node = random.choice(self.network_nodes)
-                log_entry = self._generate_mock_log(node)
-                for pattern in log_patterns:
-                    if pattern["pattern"] in log_entry["message"].lower():
-                        logger.info(f"Found pattern '{pattern['pattern']}' in log from {node['id']}")
-                        self._create_alarm(node_id=node["id"], alarm_type=pattern["alarm_type"], severity=pattern["severity"], description=f"Log pattern match: {pattern['pattern']}")
-            time.sleep(self.log_parse_interval)
-    def _generate_mock_log(self, node):
-        log_types = [
-            "INFO: Normal operation",
-            "INFO: Service started",
-            "INFO: Connection established",
-            "WARNING: High resource usage",
-            "WARNING: Authentication failed",
-            "ERROR: Connection timed out",
-            "ERROR: Service unavailable",
-            "CRITICAL: Out of memory",
-            "CRITICAL: Temperature exceeds threshold"
-        ]
+            due, index = schedule[0]
+            if self._stop_evt.wait(max(0.0, due - time.monotonic())):
+                break
+            tick, interval = jobs[index]
+            # The jobs share this thread, so one failing tick must not stop the others.
+            try:
+                tick()
+            except Exception as e:
+                logger.error("Error in OA&M job %s: %s", tick.__name__, e)
+            heapq.heapreplace(schedule, (time.monotonic() + getattr(self, interval), index))
+    def _do_health_check(self):
+        logger.info("Performing health check on network nodes")
+        ts = datetime.now().isoformat()  # shared by every alarm raised this tick
+        n = len(self.node_ids)
+        if NUMPY_AVAILABLE:
+            # One (node, metric) uniform draw and one threshold mask for the whole fleet.
+            samples = self._np_rng.uniform(_HEALTH_LOW, _HEALTH_HIGH, size=(n, len(_HEALTH_METRICS)))
+            breaches = np.argwhere(samples > _HEALTH_LIMIT).tolist()
+            samples = samples.tolist()
+        else:
+            rnd = self._rng.random
+            samples = [[low + (high - low) * rnd() for low, high, *_ in _HEALTH_METRICS] for _ in range(n)]
+            breaches = [(index, metric) for index, row in enumerate(samples) for metric, value in enumerate(row) if value > _HEALTH_METRICS[metric][2]]
+        if logger.isEnabledFor(logging.INFO):
+            for node_id, (cpu_usage, memory_usage, disk_usage) in zip(self.node_ids, samples):
+                logger.info("Node %s health: CPU=%.1f%%, Memory=%.1f%%, Disk=%.1f%%", node_id, cpu_usage, memory_usage, disk_usage)
+        # Breaches come out node-major, metric-minor, so alarms keep their CPU, memory, disk order per node.
+        for index, metric in breaches:
+            _, _, _, alarm_type, severity, description = _HEALTH_METRICS[metric]
+            self._create_alarm(node_id=self.node_ids[index], alarm_type=alarm_type, severity=severity, description=description.format(samples[index][metric]), ts=ts)
+    def _do_fault_generation(self):
+        logger.info("Checking for random fault generation")
+        ts = datetime.now().isoformat()
+        n = len(self.node_ids)
+        if NUMPY_AVAILABLE:
+            # One Bernoulli matrix of (node, fault type) trials per tick; argwhere yields the hits node-major.
+            hits = np.argwhere(self._np_rng.random((n, len(_FAULT_TYPES))) < _FAULT_PROBABILITIES).tolist()
+        else:
+            rnd = self._rng.random
+            hits = [(index, fault_index) for index in range(n) for fault_index, fault in enumerate(_FAULT_TYPES) if rnd() < fault["probability"]]
+        for index, fault_index in hits:
+            fault = _FAULT_TYPES[fault_index]
+            node_id = self.node_ids[index]
+            logger.info("Generating %s fault for node %s", fault["type"], node_id)
+            alarm_type, severity, description, marks_down = _FAULT_SPEC[fault["type"]]
+            if marks_down:
+                self.node_status[index] = _NODE_DOWN
+            alarm_id = self._create_alarm(node_id=node_id, alarm_type=alarm_type, severity=severity, description=description.format(id=node_id), ts=ts)
+            if marks_down:
+                self._node_down_alarms.setdefault(node_id, []).append(alarm_id)
+        if NUMPY_AVAILABLE:
+            down = np.frombuffer(self.node_status, dtype=np.uint8) == _NODE_DOWN
+            recovered = np.flatnonzero(down & (self._np_rng.random(n) < _RECOVERY_PROBABILITY)).tolist()
+        else:
+            recovered = [i for i, status in enumerate(self.node_status) if status == _NODE_DOWN and rnd() < _RECOVERY_PROBABILITY]
+        for index in recovered:
+            node_id = self.node_ids[index]
+            logger.info("Node %s recovered", node_id)
+            self.node_status[index] = _NODE_ACTIVE
+            for alarm_id in self._node_down_alarms.pop(node_id, ()):
+                self._clear_alarm(alarm_id, ts)
+    def _do_log_parsing(self):
+        ts = datetime.now().isoformat()
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for index in self._rng.choices(range(len(self.node_ids)), k=self._rng.randint(5, 15)):
+            node_id = self.node_ids[index]
+            log_entry = self._generate_mock_log(node_id, self.node_types[index], ts)
+            message = log_entry["message"].lower()  # lowercased once per line, not per pattern
+            hits = [_LOG_PATTERNS[pattern_index] for pattern_index in _match_log_patterns(message)]
+            if hits and debug:
+                logger.debug("Log pattern matches on %s: %s", node_id, [pattern["pattern"] for pattern in hits])
+            for pattern in hits:
+                self._create_alarm(node_id=node_id, alarm_type=pattern["alarm_type"], severity=pattern["severity"], description=f"Log pattern match: {pattern['pattern']}", ts=ts)
+    def _generate_mock_log(self, node_id, node_type, ts=None):
         return {
-            "timestamp": datetime.now().isoformat(),
-            "node_id": node["id"],
-            "node_type": node["type"],
-            "message": random.choice(log_types),
-            "source": f"{node['type']}-service"
-        }
-    def _create_alarm(self, node_id, alarm_type, severity, description):
-        alarm_id = self.alarm_id_counter
-        self.alarm_id_counter += 1
-        alarm = {
-            "id": alarm_id,
+            "timestamp": ts or datetime.now().isoformat(),
             "node_id": node_id,
-            "type": alarm_type.name,
-            "severity": severity.name,
-            "description": description,
-            "raised_time": datetime.now().isoformat(),
-            "status": "active"
+            "node_type": node_type,
+            "message": self._rng.choice(_LOG_TYPES),
+            "source": f"{node_type}-service"
         }
-        self.alarms[alarm_id] = alarm
-        logger.warning(f"ALARM RAISED: {severity.name} - {description} on {node_id}")
+    def _create_alarm(self, node_id, alarm_type, severity, description, ts=None):
+        alarm_id = next(self._alarm_ids)
+        severity_name = _SEVERITY_NAMES[severity]
+        alarm = Alarm(id=alarm_id, node_id=node_id, type=_TYPE_NAMES[alarm_type], severity=severity_name, description=description, raised_time=ts or datetime.now().isoformat())
+        with self._lock:
+            self.alarms[alarm_id] = alarm
+            self._active_alarm_ids[alarm_id] = None
+            self.version += 1
+        logger.warning("ALARM RAISED: %s - %s on %s", severity_name, description, node_id)
         return alarm_id
-    def _clear_alarm(self, alarm_id):
-        if alarm_id in self.alarms:
-            alarm = self.alarms[alarm_id]
-            alarm["status"] = "cleared"
-            alarm["cleared_time"] = datetime.now().isoformat()
-            logger.info(f"ALARM CLEARED: {alarm['severity']} - {alarm['description']} on {alarm['node_id']}")
+    def _clear_alarm(self, alarm_id, ts=None):
+        with self._lock:
+            alarm = self.alarms.get(alarm_id)
+            if alarm is not None and alarm.status == "cleared":
+                alarm = None  # already cleared and counted in _cleared_order
+            if alarm is not None:
+                alarm.status = "cleared"
+                alarm.cleared_time = ts or datetime.now().isoformat()
+                if len(self._cleared_order) == self._cleared_order.maxlen:
+                    del self.alarms[self._cleared_order[0]]
+                self._cleared_order.append(alarm_id)
+                self._active_alarm_ids.pop(alarm_id, None)
+                self.version += 1
+        if alarm is not None:
+            logger.info("ALARM CLEARED: %s - %s on %s", alarm.severity, alarm.description, alarm.node_id)
             return True
         return False
     def get_alarms(self, filter_status=None):
-        if filter_status:
-            return {k: v for k, v in self.alarms.items() if v["status"] == filter_status}
-        return self.alarms 
\ No newline at end of file
+        with self._lock:
+            if filter_status == "active":
+                return {k: self.alarms[k].to_dict() for k in self._active_alarm_ids}
+            if filter_status:
+                return {k: v.to_dict() for k, v in self.alarms.items() if v.status == filter_status}
+            return {k: v.to_dict() for k, v in self.alarms.items()} 
\ No newline at end of file
@@ -1,4 +1,5 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from oam import OAMAutomation
 from kpi import KPIMonitoring
 from event import EventSimulator
@@ -29,9 +30,7 @@ class OAMPlatform:
             return
         logger.info("Starting 5G OA&M Platform")
         self.running = True
-        for name, component in self.components.items():
-            component.start()
-            logger.info(f"Started {name} component")
+        self._run_on_components("start", "Started")
         logger.info("Platform started successfully")
     def stop(self):
         if not self.running:
@@ -39,10 +38,14 @@ class OAMPlatform:
             return
         logger.info("Stopping 5G OA&M Platform")
         self.running = False
-        for name, component in self.components.items():
-            component.stop()
-            logger.info(f"Stopped {name} component")
+        self._run_on_components("stop", "Stopped")
         logger.info("Platform stopped successfully")
+    def _run_on_components(self, method, verb):
+        with ThreadPoolExecutor(max_workers=len(self.components)) as executor:
+            futures = {name: executor.submit(getattr(component, method)) for name, component in self.components.items()}
+            for name, future in futures.items():
+                future.result()
+                logger.info(f"{verb} {name} component")
     def get_status(self):
         status = {
             "platform": "running" if self.running else "stopped",